@@ -1,9 +1,14 @@
 import streamlit as st
 import importlib
-from utils.auth import login_user
+from utils.auth import login_user, ensure_users
+from utils.data import ensure_files
 
 st.set_page_config(page_title="Attendance Kids", layout="wide")
 
+# Create missing data files once per process
+ensure_users()
+ensure_files()
+
 # Initialize session state
 if "user" not in st.session_state:
     st.session_state.user = None
@@ -11,11 +16,14 @@ if "user" not in st.session_state:
 # Login Page
 if not st.session_state.user:
     st.title("Login")
-    role_choice = st.selectbox("Login as", ["admin", "leader"], key="login_role_main")
-    username = st.text_input("Username", key="login_user_main")
-    password = st.text_input("Password", type="password", key="login_pw_main")
+    # A form sends all fields in one rerun on submit instead of one per edited field
+    with st.form("login_form"):
+        role_choice = st.selectbox("Login as", ["admin", "leader"], key="login_role_main")
+        username = st.text_input("Username", key="login_user_main")
+        password = st.text_input("Password", type="password", key="login_pw_main")
+        submitted = st.form_submit_button("Sign in")
 
-    if st.button("Sign in", key="login_btn_main"):
+    if submitted:
         user = login_user(username.strip(), password, role_choice)
         if user:
             st.session_state.user = user
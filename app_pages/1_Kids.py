@@ -1,19 +1,16 @@
 import streamlit as st
 import pandas as pd
 import os
+from utils.data import read_csv, append_csv
 
 KIDS_FILE = "kids.csv"
 
 # Load kids data
 def load_kids():
     if os.path.exists(KIDS_FILE):
-        return pd.read_csv(KIDS_FILE)
+        return read_csv(KIDS_FILE)
     return pd.DataFrame(columns=["Name", "Age", "Program", "Leader"])
 
-# Save kids data
-def save_kids(df):
-    df.to_csv(KIDS_FILE, index=False)
-
 def run():
     st.title("Kids Attendance / Management")
 
@@ -51,9 +48,7 @@ def run():
         if submitted:
             if kid_name.strip() != "" and program:
                 new_kid = {"Name": kid_name.strip(), "Age": age, "Program": program, "Leader": username}
-                new_kid_df = pd.DataFrame([new_kid])
-                kids = pd.concat([kids, new_kid_df], ignore_index=True)
-                save_kids(kids)
+                append_csv(KIDS_FILE, [new_kid], kids.columns)
                 st.success(f"{kid_name} added successfully!")
                 st.experimental_rerun()
             else:
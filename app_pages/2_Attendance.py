@@ -1,60 +1,64 @@
 import streamlit as st
 import pandas as pd
 import os
+from utils.data import read_csv, append_csv, mtime_ns
 
 KIDS_FILE = "kids.csv"
 ATTENDANCE_FILE = "attendance.csv"
+ATTENDANCE_COLUMNS = ["Date", "Kid", "Present", "MarkedBy"]
 
 def load_kids():
     if os.path.exists(KIDS_FILE):
-        return pd.read_csv(KIDS_FILE)
+        return read_csv(KIDS_FILE)
     return pd.DataFrame(columns=["Name", "Age", "Program", "Leader"])
 
-def load_attendance():
-    if os.path.exists(ATTENDANCE_FILE):
-        return pd.read_csv(ATTENDANCE_FILE)
-    return pd.DataFrame(columns=["Date", "Kid", "Present", "MarkedBy"])
-
-def save_attendance(df):
-    df.to_csv(ATTENDANCE_FILE, index=False)
+# Kids split by leader once per kids.csv version, so scoping a leader is a dict lookup.
+# Held as a shared resource (no per-call unpickling); the frames are read-only.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def kids_by_leader(kids_mtime):
+    kids = load_kids()
+    return {leader: group for leader, group in kids.groupby("Leader")}
 
 def run():
     st.title("Mark Attendance")
 
     kids = load_kids()
-    attendance = load_attendance()
 
     if kids.empty:
         st.info("No kids available. Please add kids first on the Kids page.")
         return
 
-    username = st.session_state.user.get("username", "unknown") if "user" in st.session_state else "unknown"
-    role = st.session_state.user.get("role", "leader").lower() if "user" in st.session_state else "leader"
+    # Get current user once
+    if "user" in st.session_state:
+        user = st.session_state.user
+        username = user.get("username", "unknown")
+        role = user.get("role", "leader").lower()
+    else:
+        username = "unknown"
+        role = "leader"
 
     if role == "leader":
-        kids = kids[kids["Leader"] == username]
-
-    st.subheader("Kids List")
-    st.dataframe(kids[["Name", "Program", "Age"]])
+        kids = kids_by_leader(mtime_ns(KIDS_FILE)).get(username, kids.iloc[0:0])
 
     st.subheader("Mark Attendance for Today")
     with st.form("attendance_form"):
         today = pd.Timestamp.now().strftime("%Y-%m-%d")
-        present_kids = st.multiselect("Select kids who are present", kids["Name"].tolist())
+        # One editable table for the whole list; edits are sent together on submit
+        roll = kids[["Name", "Program", "Age"]].assign(Present=False)
+        edited = st.data_editor(roll, disabled=["Name", "Program", "Age"], hide_index=True, key="att_editor")
         submitted = st.form_submit_button("Submit Attendance")
 
         if submitted:
-            if not present_kids:
+            if not edited["Present"].any():
                 st.warning("No kids selected as present.")
             else:
-                for kid in kids["Name"]:
-                    record = {
-                        "Date": today,
-                        "Kid": kid,
-                        "Present": kid in present_kids,
-                        "MarkedBy": username
-                    }
-                    attendance = pd.concat([attendance, pd.DataFrame([record])], ignore_index=True)
-                save_attendance(attendance)
+                records = pd.DataFrame({
+                    "Date": today,
+                    "Kid": edited["Name"].to_numpy(),
+                    "Present": edited["Present"].to_numpy(),
+                    "MarkedBy": username
+                })
+                # append today's rows; earlier history is never rewritten
+                append_csv(ATTENDANCE_FILE, records, ATTENDANCE_COLUMNS)
                 st.success("Attendance recorded successfully!")
                 st.experimental_rerun()
@@ -1,24 +1,42 @@
 import streamlit as st
 import pandas as pd
 import os
+from utils.data import read_csv, mtime_ns
 
 KIDS_FILE = "kids.csv"
 ATTENDANCE_FILE = "attendance.csv"
 
-# Load kids
+# Load kids (only the columns reports use)
 def load_kids():
     if os.path.exists(KIDS_FILE):
-        return pd.read_csv(KIDS_FILE)
-    return pd.DataFrame(columns=["Name", "Age", "Program", "Leader"])
+        return read_csv(KIDS_FILE, usecols=["Name", "Program"])
+    return pd.DataFrame(columns=["Name", "Program"])
 
 # Load attendance and normalize column names
 def load_attendance():
     if os.path.exists(ATTENDANCE_FILE):
-        df = pd.read_csv(ATTENDANCE_FILE)
-        df.columns = [c.strip().capitalize() for c in df.columns]  # Normalize headers
-        return df
+        # Normalize headers (rename copies, so the shared cached frame is untouched)
+        return read_csv(ATTENDANCE_FILE).rename(columns=lambda c: c.strip().capitalize())
     return pd.DataFrame(columns=["Date", "Name", "Program", "Status"])
 
+# Attendance indexed by kid name (newest first within a kid) so a report is a label lookup.
+# The file is append-only, so a day that was marked again is resolved here: the last row wins.
+# A kid can attend several programs on one day, so Program is part of the key when present.
+# Names and programs repeat on every row, so they're held as categoricals.
+# Shared by reference across reruns and sessions, so the frame is read-only.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def attendance_by_kid(attendance_mtime):
+    df = load_attendance()
+    df = df.drop_duplicates([c for c in ("Name", "Date", "Program") if c in df.columns], keep="last")
+    df = df.astype({c: "category" for c in ("Name", "Program") if c in df.columns})
+    return df.sort_values(["Name", "Date"], ascending=[True, False]).set_index("Name", drop=False)
+
+# Per-kid totals in one groupby pass over the categorical index, recomputed only when attendance.csv changes
+@st.cache_resource(show_spinner=False, max_entries=2)
+def attendance_stats(attendance_mtime):
+    df = attendance_by_kid(attendance_mtime)
+    present = df["Status"].astype(str).str.lower() == "present"
+    return present.groupby(level="Name", observed=True).agg(total="size", present="sum")
 
 def run():
     st.title("Reports")
@@ -34,7 +52,7 @@ def run():
 
     # Load data
     kids_df = load_kids()
-    attendance_df = load_attendance()
+    attendance_mtime = mtime_ns(ATTENDANCE_FILE)
 
     # Filter kids based on role
     if role == "leader" and program:
@@ -50,16 +68,17 @@ def run():
     if selected_kid:
         st.write(f"### Attendance Report for {selected_kid}")
 
-        # Filter attendance for the selected kid
-        kid_attendance = attendance_df[attendance_df["Name"] == selected_kid]
-
-        if kid_attendance.empty:
+        # Look up attendance for the selected kid
+        by_kid = attendance_by_kid(attendance_mtime)
+        if selected_kid not in by_kid.index:
             st.warning("No attendance records found for this kid.")
             return
+        kid_attendance = by_kid.loc[[selected_kid]].reset_index(drop=True)
 
         # Calculate attendance percentage
-        total_classes = len(kid_attendance)
-        present_count = len(kid_attendance[kid_attendance["Status"].str.lower() == "present"])
+        stats = attendance_stats(attendance_mtime).loc[selected_kid]
+        total_classes = int(stats["total"])
+        present_count = int(stats["present"])
         attendance_percentage = (present_count / total_classes) * 100
 
         # Show summary
@@ -72,4 +91,4 @@ def run():
 
         # Show attendance history
         st.subheader("Attendance History")
-        st.dataframe(kid_attendance.sort_values(by="Date", ascending=False))
+        st.dataframe(kid_attendance)
@@ -1,19 +1,16 @@
 import streamlit as st
 import pandas as pd
 import os
+from utils.data import read_csv, append_csv
 
 USERS_FILE = "users.csv"
 
 # Load users
 def load_users():
     if os.path.exists(USERS_FILE):
-        return pd.read_csv(USERS_FILE)
+        return read_csv(USERS_FILE)
     return pd.DataFrame(columns=["Username", "FullName", "Role", "Program"])
 
-# Save users
-def save_users(df):
-    df.to_csv(USERS_FILE, index=False)
-
 def run():
     st.title("Admin Page - User Management")
 
@@ -45,8 +42,6 @@ def run():
                     "Role": role,
                     "Program": program
                 }
-                new_user_df = pd.DataFrame([new_user])
-                users = pd.concat([users, new_user_df], ignore_index=True)
-                save_users(users)
+                append_csv(USERS_FILE, [new_user], users.columns)
                 st.success(f"User '{username}' added successfully!")
                 st.experimental_rerun()
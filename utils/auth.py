@@ -1,43 +1,109 @@
+import streamlit as st
 import pandas as pd
 import os
+import hmac
+import hashlib
+import secrets
+from utils.data import read_csv, mtime_ns, write_csv
 
 USERS_CSV = os.path.join("data","users.csv")
 
-def load_users():
+# scrypt cost parameters (~16 MB and tens of ms per hash); stored with each hash so they can be raised later
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2**14, 8, 1
+
+def hash_password(password, salt=None, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    # salted scrypt, stored as "scrypt$<n>$<r>$<p>$<salt hex>$<digest hex>"
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.scrypt(str(password).encode(), salt=salt, n=n, r=r, p=p, dklen=32).hex()
+    return f"scrypt${n}${r}${p}${salt.hex()}${digest}"
+
+def _hash_blake2b(password, salt):
+    # legacy single-pass format "blake2b$<salt hex>$<digest hex>"; verified only, never written
+    digest = hashlib.blake2b(str(password).encode(), salt=salt, digest_size=32).hexdigest()
+    return f"blake2b${salt.hex()}${digest}"
+
+def is_hashed(stored):
+    # current scheme only; anything else is rehashed on the next successful sign-in
+    parts = str(stored).split("$")
+    return len(parts) == 6 and parts[0] == "scrypt"
+
+def check_password(password, stored):
+    # constant-time compare so response time doesn't leak how much of the password matched
+    stored = str(stored)
+    parts = stored.split("$")
+    try:
+        if is_hashed(stored):
+            n, r, p = (int(x) for x in parts[1:4])
+            return hmac.compare_digest(hash_password(password, bytes.fromhex(parts[4]), n, r, p), stored)
+        if len(parts) == 3 and parts[0] == "blake2b":
+            return hmac.compare_digest(_hash_blake2b(password, bytes.fromhex(parts[1])), stored)
+    except ValueError:
+        # corrupt salt or cost parameters; reject the credentials rather than crash the login screen
+        return False
+    # legacy plaintext row; login_user rehashes it on the next successful sign-in
+    return hmac.compare_digest(stored.encode(), str(password).encode())
+
+# verified against when no row matches, so unknown users cost the same scrypt run as a wrong password
+_DUMMY_HASH = hash_password(secrets.token_hex(16))
+
+_users_ready = False
+
+def ensure_users():
+    global _users_ready
+    if _users_ready:
+        return
     if not os.path.exists(USERS_CSV) or os.stat(USERS_CSV).st_size == 0:
         # create default users if missing
         os.makedirs(os.path.dirname(USERS_CSV), exist_ok=True)
         df = pd.DataFrame([
-            {"username":"admin","password":"123","role":"admin","program":"","full_name":"Administrator"},
-            {"username":"leader1","password":"123","role":"leader","program":"Football Boys","full_name":"Leader One"}
+            {"username":"admin","password":hash_password("123"),"role":"admin","program":"","full_name":"Administrator"},
+            {"username":"leader1","password":hash_password("123"),"role":"leader","program":"Football Boys","full_name":"Leader One"}
         ])
         df.to_csv(USERS_CSV, index=False)
+    _users_ready = True
+
+def load_users():
+    ensure_users()
     try:
-        return pd.read_csv(USERS_CSV, dtype=str).fillna("").to_dict(orient="records")
+        return read_csv(USERS_CSV, dtype="str").to_dict(orient="records")
     except Exception:
         return []
 
 def save_users(users):
-    df = pd.DataFrame(users)
-    os.makedirs(os.path.dirname(USERS_CSV), exist_ok=True)
-    df.to_csv(USERS_CSV, index=False)
+    write_csv(USERS_CSV, pd.DataFrame(users))
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _users_index(users_mtime):
+    # (username, role) -> user row, rebuilt only when users.csv changes; shared, so read-only.
+    # Keyed on role too: one person can have both an admin and a leader row.
+    index = {}
+    for u in load_users():
+        index.setdefault((str(u.get("username")), str(u.get("role")).lower()), u)
+    return index
 
 def login_user(username, password, role):
-    users = load_users()
-    for u in users:
-        if str(u.get("username")) == str(username) and str(u.get("password")) == str(password) and str(u.get("role")).lower() == str(role).lower():
-            # return user dict with programs list split by comma if present
-            progs = str(u.get("program","") or "")
-            programs = [p.strip() for p in progs.split(",") if p.strip()]
-            return {"username":u.get("username"), "role":u.get("role"), "programs":programs, "full_name": u.get("full_name", u.get("username"))}
+    ensure_users()
+    u = _users_index(mtime_ns(USERS_CSV)).get((str(username), str(role).lower()))
+    if u is None:
+        # unknown username or role: still hash, so timing doesn't reveal which accounts exist
+        check_password(password, _DUMMY_HASH)
+        return None
+    if check_password(password, u.get("password")):
+        if not is_hashed(u.get("password")):
+            change_password(u.get("username"), password, u.get("role"))
+        # return user dict with programs list split by comma if present
+        progs = str(u.get("program","") or "")
+        programs = [p.strip() for p in progs.split(",") if p.strip()]
+        return {"username":u.get("username"), "role":u.get("role"), "programs":programs, "full_name": u.get("full_name", u.get("username"))}
     return None
 
-def change_password(username, new_password):
+def change_password(username, new_password, role=None):
+    # role picks one of a user's rows when they have several; None changes the first match
     users = load_users()
     changed = False
     for u in users:
-        if u.get("username") == username:
-            u["password"] = new_password
+        if u.get("username") == username and (role is None or str(u.get("role")).lower() == str(role).lower()):
+            u["password"] = hash_password(new_password)
             changed = True
             break
     if changed:
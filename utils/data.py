@@ -1,37 +1,130 @@
+import streamlit as st
 import pandas as pd
 import os
-import uuid
+import secrets
+import shutil
+import tempfile
 
 KIDS_CSV = os.path.join("data","kids.csv")
 ATT_CSV = os.path.join("data","attendance.csv")
+KIDS_COLUMNS = ["id","name","age","program","dob","gender","school","location","guardian_name","guardian_contact","relationship","image"]
+ATT_COLUMNS = ["date","kid_id","present","note","program","marked_by","timestamp"]
 
 def ensure_csv(path, headers):
     if not os.path.exists(path) or os.stat(path).st_size == 0:
         os.makedirs(os.path.dirname(path), exist_ok=True)
         pd.DataFrame(columns=headers).to_csv(path, index=False)
 
+_files_ready = False
+
+def ensure_files():
+    # create missing data files once per process rather than stat-ing them on every load
+    global _files_ready
+    if _files_ready:
+        return
+    ensure_csv(KIDS_CSV, KIDS_COLUMNS)
+    ensure_csv(ATT_CSV, ATT_COLUMNS)
+    _files_ready = True
+
+# columns kept as ISO strings; pyarrow would otherwise infer them as date/timestamp objects
+TEXT_DATE_COLUMNS = ("date", "timestamp")
+
+def _parse_csv(path, dtype, usecols):
+    # pyarrow's multithreaded parser; pyarrow is always present as a streamlit dependency.
+    # String reads keep empty cells as "" instead of converting NA markers and filling them back.
+    na_opts = {"keep_default_na": False} if dtype == "str" else {}
+    if dtype is None:
+        header = pd.read_csv(path, nrows=0).columns
+        dtype = {c: "str" for c in header if c.strip().lower() in TEXT_DATE_COLUMNS and (not usecols or c in usecols)} or None
+    opts = dict(dtype=dtype, usecols=list(usecols) if usecols else None, **na_opts)
+    try:
+        return pd.read_csv(path, engine="pyarrow", **opts)
+    except pd.errors.ParserError:
+        # pyarrow rejects ragged rows (e.g. a hand-edited short line); the C parser pads them with NaN
+        return pd.read_csv(path, **opts)
+
+@st.cache_resource(show_spinner=False)
+def _frame_store():
+    # process-wide {(path, dtype, usecols): (mtime, frame)}, shared by every session
+    return {}
+
+def mtime_ns(path):
+    # file version used as a cache key; 0 when the file doesn't exist yet
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+
+def read_csv(path, dtype=None, usecols=None):
+    # One parsed frame per file, reused until the file's mtime changes. Frames are
+    # shared between sessions without copying, so callers must not mutate them in place.
+    # usecols projects the read down to the columns a page actually needs.
+    usecols = tuple(usecols) if usecols else None
+    mtime = os.stat(path).st_mtime_ns
+    store = _frame_store()
+    key = (path, dtype, usecols)
+    hit = store.get(key)
+    if hit is None or hit[0] != mtime:
+        hit = (mtime, _parse_csv(path, dtype, usecols))
+        store[key] = hit
+    return hit[1]
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+def append_csv(path, rows, columns):
+    # append rows without rewriting the file; the header is only written for a new file
+    new_file = not os.path.exists(path) or os.stat(path).st_size == 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    rows = pd.DataFrame(rows, columns=columns)
+    if not new_file and list(pd.read_csv(path, nrows=0).columns) != list(columns):
+        # the file's header differs from the rows; appending would misalign columns,
+        # so rewrite with the union of both column sets instead
+        existing = pd.read_csv(path, dtype="str", keep_default_na=False)
+        write_csv(path, pd.concat([existing, rows], ignore_index=True))
+        return
+    if not new_file and not _ends_with_newline(path):
+        # a hand-edited file may lack its final newline; don't glue the new row onto the last line
+        with open(path, "a", newline="") as f:
+            f.write("\n")
+    rows.to_csv(path, mode="a", header=new_file, index=False)
+
+def write_csv(path, df):
+    # full rewrite via a temp file in the same directory, swapped in with one atomic rename
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            df.to_csv(f, index=False)
+            f.flush()
+            # the data must be on disk before the rename, or a crash can leave an empty file
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            # mkstemp creates the file 0600; keep the target's permissions across the swap
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
 def load_kids():
-    ensure_csv(KIDS_CSV, ["id","name","age","program","dob","gender","school","location","guardian_name","guardian_contact","relationship","image"])
-    df = pd.read_csv(KIDS_CSV, dtype=str).fillna("")
+    ensure_files()
+    df = read_csv(KIDS_CSV, dtype="str")
     return df
 
 def save_kids(df):
-    os.makedirs(os.path.dirname(KIDS_CSV), exist_ok=True)
-    df.to_csv(KIDS_CSV, index=False)
+    write_csv(KIDS_CSV, df)
 
 def add_kid_record(name, age, program, dob="", gender="", school="", location="", guardian_name="", guardian_contact="", relationship="", image=""):
-    df = load_kids()
-    kid_id = str(uuid.uuid4())[:8]
+    kid_id = secrets.token_hex(4)
     row = {"id": kid_id, "name": name, "age": str(age), "program": program, "dob": dob, "gender": gender, "school": school, "location": location, "guardian_name": guardian_name, "guardian_contact": guardian_contact, "relationship": relationship, "image": image}
-    df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-    save_kids(df)
+    append_csv(KIDS_CSV, [row], KIDS_COLUMNS)
     return kid_id
 
 def load_attendance():
-    ensure_csv(ATT_CSV, ["date","kid_id","present","note","program","marked_by","timestamp"])
-    df = pd.read_csv(ATT_CSV, dtype=str).fillna("")
+    ensure_files()
+    df = read_csv(ATT_CSV, dtype="str")
     return df
 
 def save_attendance(df):
-    os.makedirs(os.path.dirname(ATT_CSV), exist_ok=True)
-    df.to_csv(ATT_CSV, index=False)
+    write_csv(ATT_CSV, df)